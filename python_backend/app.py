@@ -2,6 +2,8 @@
 Main Flask application for the Telecom Log Analysis platform
 """
 import os
+import re
+import math
 import json
 import time
 from datetime import datetime
@@ -10,15 +12,59 @@ import uuid
 import logging
 from pathlib import Path
 from flask import Flask, request, jsonify, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
+import orjson
 
 # Setup basic logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _has_non_finite_float(obj: Any) -> bool:
+    """Check whether a JSON-like structure holds a NaN or infinite float"""
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            if not math.isfinite(item):
+                return True
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return False
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson for responses and request bodies"""
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize data as JSON, leaving dates to Flask's HTTP-date format"""
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        try:
+            payload = orjson.dumps(obj, default=self.default, option=option)
+        except TypeError:
+            # orjson rejects integers beyond 64 bits, which the json module encodes
+            return super().dumps(obj, **kwargs)
+            
+        # orjson writes NaN and Infinity as null; only a payload with a null
+        # can hide one, so only then is the data checked
+        if b"null" in payload and _has_non_finite_float(obj):
+            return super().dumps(obj, **kwargs)
+        return payload.decode("utf-8")
+        
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        """Deserialize data as JSON"""
+        return orjson.loads(s)
+
 # Initialize Flask app
 app = Flask(__name__, static_folder='../client/dist')
+# Log listings carry full file contents, so encoding speed matters
+app.json = OrjsonProvider(app)
 CORS(app)
 
 # Constants
@@ -26,6 +72,9 @@ UPLOAD_FOLDER = Path('uploads')
 UPLOAD_FOLDER.mkdir(exist_ok=True)
 ALLOWED_EXTENSIONS = {'txt', 'log', 'pcap'}
 
+# Keywords the background analysis looks for, one named group per issue kind
+ISSUE_KEYWORD_RE = re.compile(r"(?P<error>error)|(?P<warning>warning)", re.IGNORECASE)
+
 # In-memory data stores (replace with database in production)
 logs_data = []
 analysis_results = []
@@ -239,9 +288,17 @@ def process_log_file(log_id, content):
     # Create analysis result
     analysis_id = len(analysis_results) + 1
     
+    # Single case-insensitive scan for the keywords, instead of lowercasing
+    # the whole log once per keyword, stopping once both have been seen
+    found = set()
+    for match in ISSUE_KEYWORD_RE.finditer(content):
+        found.add(match.lastgroup)
+        if len(found) == len(ISSUE_KEYWORD_RE.groupindex):
+            break
+    
     # Simple mock analysis (in a real app, this would use an LLM)
     mock_issues = []
-    if "error" in content.lower():
+    if "error" in found:
         mock_issues.append({
             "id": 1,
             "type": "error",
@@ -252,7 +309,7 @@ def process_log_file(log_id, content):
             "status": "open"
         })
     
-    if "warning" in content.lower():
+    if "warning" in found:
         mock_issues.append({
             "id": 2,
             "type": "warning",
@@ -0,0 +1,113 @@
+"""
+Module for caching LLM results in Redis
+"""
+import os
+import hashlib
+from typing import Any, Optional
+import numpy as np
+import orjson
+from dotenv import load_dotenv
+
+# Conditionally import redis
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+# Load environment variables
+load_dotenv()
+
+# Vectors are stored at half precision to halve Redis memory and traffic
+VECTOR_STORAGE_DTYPE = np.float16
+
+class CacheService:
+    """Shared cache for embeddings and LLM responses backed by Redis"""
+    
+    def __init__(self):
+        """Initialize the Redis connection if one is configured"""
+        self.redis_url = os.getenv("REDIS_URL", "")
+        self.ttl = int(os.getenv("LLM_CACHE_TTL", "86400"))
+        self.client = None
+        
+        # The cache is opt-in: without redis or a REDIS_URL every lookup misses
+        self.enabled = HAS_REDIS and bool(self.redis_url)
+        
+        if self.redis_url and not HAS_REDIS:
+            print("Warning: REDIS_URL is set but the redis package is not installed; caching is disabled")
+            
+        if self.enabled:
+            self._connect()
+            
+        print(f"Cache Service: {'Enabled' if self.enabled else 'Disabled'}")
+        
+    def _connect(self) -> bool:
+        """Connect to the Redis server"""
+        try:
+            self.client = redis.Redis.from_url(self.redis_url)
+            self.client.ping()
+            print(f"Connected to Redis at {self.redis_url}")
+            return True
+        except Exception as e:
+            print(f"Failed to connect to Redis: {e}")
+            self.enabled = False
+            self.client = None
+            return False
+            
+    def make_key(self, namespace: str, *parts: str) -> str:
+        """Build a cache key from a namespace and a digest of the inputs"""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return f"{namespace}:{digest.hexdigest()}"
+        
+    def get_vector(self, key: str) -> Optional[np.ndarray]:
+        """Get a cached vector, widened back to float32"""
+        if not self.enabled:
+            return None
+            
+        try:
+            raw = self.client.get(key)
+            if raw is None:
+                return None
+            return np.frombuffer(raw, dtype=VECTOR_STORAGE_DTYPE).astype(np.float32)
+        except Exception as e:
+            print(f"Error reading vector from cache: {e}")
+            return None
+            
+    def set_vector(self, key: str, vector: Any) -> None:
+        """Cache a vector as raw half-precision bytes"""
+        if not self.enabled:
+            return
+            
+        try:
+            data = np.asarray(vector, dtype=VECTOR_STORAGE_DTYPE).tobytes()
+            self.client.setex(key, self.ttl, data)
+        except Exception as e:
+            print(f"Error writing vector to cache: {e}")
+            
+    def get_json(self, key: str) -> Optional[Any]:
+        """Get a cached JSON value"""
+        if not self.enabled:
+            return None
+            
+        try:
+            raw = self.client.get(key)
+            if raw is None:
+                return None
+            return orjson.loads(raw)
+        except Exception as e:
+            print(f"Error reading value from cache: {e}")
+            return None
+            
+    def set_json(self, key: str, value: Any) -> None:
+        """Cache a JSON-serializable value"""
+        if not self.enabled:
+            return
+            
+        try:
+            data = orjson.dumps(value)
+            self.client.setex(key, self.ttl, data)
+        except Exception as e:
+            print(f"Error writing value to cache: {e}")
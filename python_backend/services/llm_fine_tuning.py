@@ -3,12 +3,25 @@ Module for fine-tuning the local LLM on telecom-specific data.
 """
 import os
 import json
+import mmap
 import uuid
 import time
 import random
+from contextlib import contextmanager
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Union
 from pathlib import Path
+import orjson
+
+# Conditionally import fcntl to lock the jobs files across processes
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+# Size at which the jobs append log is folded back into the jobs snapshot
+JOBS_LOG_COMPACT_BYTES = 1024 * 1024
 
 class LLMFineTuningService:
     """Service for fine-tuning the local LLM on telecom-specific data"""
@@ -24,34 +37,165 @@ class LLMFineTuningService:
         self.datasets_file = self.data_dir / "datasets.json"
         self.models_file = self.data_dir / "models.json"
         
+        # Append-only log of job mutations on top of the jobs snapshot, and
+        # the lock file that serializes appends and compaction between
+        # service instances sharing the directory
+        self.jobs_log_file = self.data_dir / "jobs.ndjson"
+        self.jobs_lock_file = self.data_dir / "jobs.lock"
+        
         # Initialize files if they don't exist
         for file_path in [self.jobs_file, self.datasets_file, self.models_file]:
             if not file_path.exists():
                 with open(file_path, "w") as f:
                     json.dump([], f)
                     
-    def _load_jobs(self) -> List[Dict[str, Any]]:
-        """Load fine-tuning jobs from the jobs file"""
+        # Rebuild the in-memory job table from the snapshot and the log. The
+        # snapshot stamp and log offset tell what the table already reflects
+        self._jobs_by_id = {}
+        self._jobs_snapshot_stamp = None
+        self._jobs_log_offset = 0
+        with self._jobs_lock():
+            self._replay_jobs()
+            self._compact_jobs()
+                    
+    def _read_json_file(self, file_path: Path) -> Any:
+        """Read a JSON file through a read-only memory map"""
+        with open(file_path, "rb") as f:
+            # mmap refuses zero-length files
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as buffer:
+                    return orjson.loads(buffer)
+                    
+    def _write_json_file(self, file_path: Path, data: Any) -> None:
+        """Atomically replace a JSON file via a temporary sibling file"""
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        
+        tmp_path = file_path.with_suffix(file_path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+                    
+    def _dumps_line(self, record: Dict[str, Any]) -> bytes:
+        """Serialize a record as a single NDJSON line"""
+        return orjson.dumps(record) + b"\n"
+        
+    @contextmanager
+    def _jobs_lock(self):
+        """Hold an exclusive lock on the jobs files, shared across processes"""
+        with open(self.jobs_lock_file, "ab") as f:
+            if HAS_FCNTL:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if HAS_FCNTL:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                    
+    def _snapshot_stamp(self) -> Any:
+        """Identify the current jobs snapshot; it changes whenever it is replaced"""
+        stat = self.jobs_file.stat()
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        
+    def _replay_jobs(self) -> None:
+        """Reload the job table from the snapshot and every mutation in the log"""
+        jobs_by_id = {}
         try:
-            with open(self.jobs_file, "r") as f:
-                return json.load(f)
+            self._jobs_snapshot_stamp = self._snapshot_stamp()
+            for job in self._read_json_file(self.jobs_file):
+                jobs_by_id[job["id"]] = job
         except Exception as e:
             print(f"Error loading jobs: {e}")
-            return []
             
-    def _save_jobs(self, jobs: List[Dict[str, Any]]) -> None:
-        """Save fine-tuning jobs to the jobs file"""
+        self._jobs_by_id = jobs_by_id
+        self._jobs_log_offset = 0
+        self._apply_jobs_log()
+        
+    def _apply_jobs_log(self) -> None:
+        """Apply the mutations appended to the jobs log since the last read"""
+        if not self.jobs_log_file.exists():
+            return
+            
+        try:
+            with open(self.jobs_log_file, "rb") as f:
+                f.seek(self._jobs_log_offset)
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = orjson.loads(line)
+                    except ValueError:
+                        # A crash can leave a partially written last line
+                        print("Skipping corrupt entry in jobs log")
+                        continue
+                    if record.get("op") == "upsert":
+                        self._jobs_by_id[record["id"]] = record["job"]
+                self._jobs_log_offset = f.tell()
+        except Exception as e:
+            print(f"Error replaying jobs log: {e}")
+            
+    def _refresh_jobs(self) -> None:
+        """Pick up job changes written by other service instances; call with the lock held"""
         try:
-            with open(self.jobs_file, "w") as f:
-                json.dump(jobs, f, indent=2)
+            log_size = self.jobs_log_file.stat().st_size if self.jobs_log_file.exists() else 0
+            if self._snapshot_stamp() != self._jobs_snapshot_stamp or log_size < self._jobs_log_offset:
+                # Another instance compacted the log into a new snapshot
+                self._replay_jobs()
+            elif log_size > self._jobs_log_offset:
+                self._apply_jobs_log()
+        except Exception as e:
+            print(f"Error refreshing jobs: {e}")
+            
+    def _compact_jobs(self) -> None:
+        """Fold the jobs log into a fresh snapshot and truncate it; call with the lock held"""
+        try:
+            if not self.jobs_log_file.exists() or self.jobs_log_file.stat().st_size == 0:
+                return
+            # Replay from disk so jobs appended by other instances are kept
+            self._replay_jobs()
+            self._write_json_file(self.jobs_file, list(self._jobs_by_id.values()))
+            # Truncate only once the snapshot holds every logged mutation
+            with open(self.jobs_log_file, "wb"):
+                pass
+            self._jobs_snapshot_stamp = self._snapshot_stamp()
+            self._jobs_log_offset = 0
+        except Exception as e:
+            print(f"Error compacting jobs: {e}")
+            
+    def _load_jobs(self) -> List[Dict[str, Any]]:
+        """Load fine-tuning jobs from the in-memory job table"""
+        with self._jobs_lock():
+            self._refresh_jobs()
+            return [dict(job) for job in self._jobs_by_id.values()]
+            
+    def _get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a copy of one job from the in-memory job table"""
+        with self._jobs_lock():
+            self._refresh_jobs()
+            job = self._jobs_by_id.get(job_id)
+        return dict(job) if job is not None else None
+        
+    def _save_job(self, job: Dict[str, Any]) -> None:
+        """Record a created or updated job by appending it to the jobs log"""
+        try:
+            with self._jobs_lock():
+                self._refresh_jobs()
+                with open(self.jobs_log_file, "ab") as f:
+                    f.write(self._dumps_line({"id": job["id"], "op": "upsert", "job": job}))
+                # Reading our own line back keeps the log offset current
+                self._apply_jobs_log()
+                if self.jobs_log_file.stat().st_size > JOBS_LOG_COMPACT_BYTES:
+                    self._compact_jobs()
         except Exception as e:
             print(f"Error saving jobs: {e}")
             
     def _load_datasets(self) -> List[Dict[str, Any]]:
         """Load datasets from the datasets file"""
         try:
-            with open(self.datasets_file, "r") as f:
-                return json.load(f)
+            return self._read_json_file(self.datasets_file)
         except Exception as e:
             print(f"Error loading datasets: {e}")
             return []
@@ -59,16 +203,14 @@ class LLMFineTuningService:
     def _save_datasets(self, datasets: List[Dict[str, Any]]) -> None:
         """Save datasets to the datasets file"""
         try:
-            with open(self.datasets_file, "w") as f:
-                json.dump(datasets, f, indent=2)
+            self._write_json_file(self.datasets_file, datasets)
         except Exception as e:
             print(f"Error saving datasets: {e}")
             
     def _load_models(self) -> List[Dict[str, Any]]:
         """Load fine-tuned models from the models file"""
         try:
-            with open(self.models_file, "r") as f:
-                return json.load(f)
+            return self._read_json_file(self.models_file)
         except Exception as e:
             print(f"Error loading models: {e}")
             return []
@@ -76,8 +218,7 @@ class LLMFineTuningService:
     def _save_models(self, models: List[Dict[str, Any]]) -> None:
         """Save fine-tuned models to the models file"""
         try:
-            with open(self.models_file, "w") as f:
-                json.dump(models, f, indent=2)
+            self._write_json_file(self.models_file, models)
         except Exception as e:
             print(f"Error saving models: {e}")
             
@@ -162,9 +303,7 @@ class LLMFineTuningService:
         }
         
         # Save the job
-        jobs = self._load_jobs()
-        jobs.append(job)
-        self._save_jobs(jobs)
+        self._save_job(job)
         
         # In a real implementation, we would start the fine-tuning process
         # For now, we'll simulate progress updates
@@ -195,27 +334,26 @@ class LLMFineTuningService:
         Returns:
             Dictionary with job information, or None if not found
         """
-        jobs = self._load_jobs()
-        for job in jobs:
-            if job["id"] == job_id:
-                # Simulate progress updates for running jobs
-                if job["status"] == "running":
-                    # Update progress (in a real implementation, this would be read from the actual job)
-                    job["progress"] = min(job["progress"] + random.uniform(5, 15), 99)
-                    
-                    # Update metrics
-                    job["metrics"] = {
-                        "loss": max(1.5 - (job["progress"] / 100), 0.5),
-                        "perplexity": max(15 - (job["progress"] / 10), 8),
-                        "accuracy": min(job["progress"] / 2, 95)
-                    }
-                    
-                    # Save the updated job
-                    self._save_jobs(jobs)
-                    
-                return job
-                
-        return None
+        job = self._get_job(job_id)
+        if job is None:
+            return None
+        
+        # Simulate progress updates for running jobs
+        if job["status"] == "running":
+            # Update progress (in a real implementation, this would be read from the actual job)
+            job["progress"] = min(job["progress"] + random.uniform(5, 15), 99)
+            
+            # Update metrics
+            job["metrics"] = {
+                "loss": max(1.5 - (job["progress"] / 100), 0.5),
+                "perplexity": max(15 - (job["progress"] / 10), 8),
+                "accuracy": min(job["progress"] / 2, 95)
+            }
+            
+            # Save the updated job
+            self._save_job(job)
+            
+        return job
         
     def get_all_fine_tuning_jobs(self) -> List[Dict[str, Any]]:
         """
@@ -239,8 +377,8 @@ class LLMFineTuningService:
                     "accuracy": min(job["progress"] / 2, 95)
                 }
                 
-        # Save the updated jobs
-        self._save_jobs(jobs)
+                # Save the updated job
+                self._save_job(job)
         
         return jobs
         
@@ -255,30 +393,23 @@ class LLMFineTuningService:
         Returns:
             Updated job information, or None if not found
         """
-        jobs = self._load_jobs()
-        
-        job_index = None
-        for i, job in enumerate(jobs):
-            if job["id"] == job_id:
-                job_index = i
-                break
-                
-        if job_index is None:
+        job = self._get_job(job_id)
+        if job is None:
             return None
             
         # Update job status
         if success:
-            jobs[job_index]["status"] = "completed"
-            jobs[job_index]["progress"] = 100
-            jobs[job_index]["message"] = "Fine-tuning completed successfully"
-            jobs[job_index]["completed_at"] = datetime.now().isoformat()
+            job["status"] = "completed"
+            job["progress"] = 100
+            job["message"] = "Fine-tuning completed successfully"
+            job["completed_at"] = datetime.now().isoformat()
             
             # Create a new fine-tuned model
             model_id = str(uuid.uuid4())
             model = {
                 "id": model_id,
                 "name": f"telecom-finetune-{model_id[:8]}",
-                "base_model": jobs[job_index]["base_model"],
+                "base_model": job["base_model"],
                 "job_id": job_id,
                 "created_at": datetime.now().isoformat(),
                 "status": "available",
@@ -295,16 +426,16 @@ class LLMFineTuningService:
             self._save_models(models)
             
             # Update job with model ID
-            jobs[job_index]["model_id"] = model_id
+            job["model_id"] = model_id
         else:
-            jobs[job_index]["status"] = "failed"
-            jobs[job_index]["message"] = "Fine-tuning failed"
-            jobs[job_index]["completed_at"] = datetime.now().isoformat()
+            job["status"] = "failed"
+            job["message"] = "Fine-tuning failed"
+            job["completed_at"] = datetime.now().isoformat()
             
-        # Save the updated jobs
-        self._save_jobs(jobs)
+        # Save the updated job
+        self._save_job(job)
         
-        return jobs[job_index]
+        return job
         
     def get_available_fine_tuned_models(self) -> List[Dict[str, Any]]:
         """
@@ -1,137 +1,203 @@
 import re
-from typing import List, Dict, Any
+from itertools import islice
+from typing import List, Dict, Any, Iterator
 from datetime import datetime
+import numpy as np
+
+# Characters of log content split into lines at a time
+LINE_BLOCK_CHARS = 64 * 1024
+
+def _iter_line_blocks(content: str) -> Iterator[List[str]]:
+    """Yield the lines of content.splitlines() in lists of about LINE_BLOCK_CHARS"""
+    start = 0
+    while start < len(content):
+        # Cut each block just after a newline so no line (or \r\n pair) is split
+        end = content.find("\n", start + LINE_BLOCK_CHARS)
+        end = len(content) if end == -1 else end + 1
+        yield content[start:end].splitlines()
+        start = end
+        
+def _iter_lines(content: str) -> Iterator[str]:
+    """Yield the same lines as content.splitlines(), one block at a time"""
+    for lines in _iter_line_blocks(content):
+        yield from lines
+
+# Possessive quantifiers (++) never give characters back: each one is followed
+# by a character it can't match, so they find the same matches as greedy ones
+# but fail fast on lines that don't fit a format
+
+# Pattern for standard log format with timestamp, level, component, and message
+STANDARD_PATTERN = re.compile(
+    r'(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d++)?(?:Z|[+-]\d{2}:\d{2})?)\s++'
+    r'(?:([A-Z]++)\s++)?'  # Optional log level (INFO, ERROR, etc.)
+    r'(?:\[([^\]]++)\]\s++)?'  # Optional component in square brackets
+    r'(.*)'  # Message
+)
+
+# Pattern for Cisco-style logs
+CISCO_PATTERN = re.compile(
+    r'(\w++\s++\d++\s++\d{2}:\d{2}:\d{2}(?:\.\d++)?)\s++'
+    r'(?:([A-Z0-9-]++):\s++)?'  # Facility/severity
+    r'(?:%([A-Z0-9-]++)(?:-\d++)?:\s++)?'  # Message code
+    r'(.*)'  # Message
+)
+
+# Pattern for Nokia/Alcatel-Lucent logs
+NOKIA_PATTERN = re.compile(
+    r'(\d{4}/\d{2}/\d{2}\s++\d{2}:\d{2}:\d{2}(?:\.\d++)?)\s++'
+    r'(?:([A-Z]++)\s++)?'  # Optional log level
+    r'(?:\[(\w++(?:\-\w++)*)\]\s++)?'  # Optional module
+    r'(.*)'  # Message
+)
+
+# Pattern for Huawei logs
+HUAWEI_PATTERN = re.compile(
+    r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d++)?)\s++'
+    r'(?:([A-Z]++)\s++)?'  # Optional severity
+    r'(?:\[([^\]]++)\]\s++)?'  # Optional product/module
+    r'(.*)'  # Message
+)
+
+# Pattern for Ericsson logs
+ERICSSON_PATTERN = re.compile(
+    r'(\d{4}-\d{2}-\d{2}\s++\d{2}:\d{2}:\d{2}(?:\.\d++)?)\s++'
+    r'(?:(\w++)\s++)?'  # Optional log level
+    r'(?:(\w++(?:\.\w++)*)\s++)?'  # Optional component
+    r'(.*)'  # Message
+)
+
+# Vendor formats in the order they are tried
+LOG_FORMATS = (
+    ("standard", STANDARD_PATTERN),
+    ("cisco", CISCO_PATTERN),
+    ("nokia", NOKIA_PATTERN),
+    ("huawei", HUAWEI_PATTERN),
+    ("ericsson", ERICSSON_PATTERN),
+)
+
+# All vendor patterns as one alternation, tried in the same order; each
+# alternative is wrapped in a named group so the format that matched is
+# match.lastgroup and its fields follow that group
+COMBINED_PATTERN = re.compile(
+    "|".join(f"(?P<{name}>{pattern.pattern})" for name, pattern in LOG_FORMATS)
+)
+
+# Combined pattern to check if it's a telecom log
+TELECOM_LOG_PATTERN = re.compile(
+    r'(\d{4}[-/]\d{2}[-/]\d{2}[T ]\d{2}:\d{2}:\d{2}|'
+    r'\w++\s++\d++\s++\d{2}:\d{2}:\d{2})'
+)
 
 class LogParser:
     """Parser for telecom log files"""
     
     def __init__(self):
         """Initialize with regex patterns for different log formats"""
-        # Pattern for standard log format with timestamp, level, component, and message
-        self.standard_pattern = re.compile(
-            r'(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:\d{2})?)\s+'
-            r'(?:([A-Z]+)\s+)?'  # Optional log level (INFO, ERROR, etc.)
-            r'(?:\[([^\]]+)\]\s+)?'  # Optional component in square brackets
-            r'(.*)'  # Message
-        )
-        
-        # Pattern for Cisco-style logs
-        self.cisco_pattern = re.compile(
-            r'(\w+\s+\d+\s+\d{2}:\d{2}:\d{2}(?:\.\d+)?)\s+'
-            r'(?:([A-Z0-9-]+):\s+)?'  # Facility/severity
-            r'(?:%([A-Z0-9-]+)(?:-\d+)?:\s+)?'  # Message code
-            r'(.*)'  # Message
-        )
-        
-        # Pattern for Nokia/Alcatel-Lucent logs
-        self.nokia_pattern = re.compile(
-            r'(\d{4}/\d{2}/\d{2}\s+\d{2}:\d{2}:\d{2}(?:\.\d+)?)\s+'
-            r'(?:([A-Z]+)\s+)?'  # Optional log level
-            r'(?:\[(\w+(?:\-\w+)*)\]\s+)?'  # Optional module
-            r'(.*)'  # Message
-        )
-        
-        # Pattern for Huawei logs
-        self.huawei_pattern = re.compile(
-            r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?)\s+'
-            r'(?:([A-Z]+)\s+)?'  # Optional severity
-            r'(?:\[([^\]]+)\]\s+)?'  # Optional product/module
-            r'(.*)'  # Message
-        )
-        
-        # Pattern for Ericsson logs
-        self.ericsson_pattern = re.compile(
-            r'(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}(?:\.\d+)?)\s+'
-            r'(?:(\w+)\s+)?'  # Optional log level
-            r'(?:(\w+(?:\.\w+)*)\s+)?'  # Optional component
-            r'(.*)'  # Message
-        )
-        
-        # Combined pattern to check if it's a telecom log
-        self.telecom_log_pattern = re.compile(
-            r'(\d{4}[-/]\d{2}[-/]\d{2}[T ]\d{2}:\d{2}:\d{2}|'
-            r'\w+\s+\d+\s+\d{2}:\d{2}:\d{2})'
-        )
+        # The patterns are compiled once at import and shared by all parsers
+        self.standard_pattern = STANDARD_PATTERN
+        self.cisco_pattern = CISCO_PATTERN
+        self.nokia_pattern = NOKIA_PATTERN
+        self.huawei_pattern = HUAWEI_PATTERN
+        self.ericsson_pattern = ERICSSON_PATTERN
+        self.combined_pattern = COMBINED_PATTERN
+        self.telecom_log_pattern = TELECOM_LOG_PATTERN
     
     def parse_log(self, content: str) -> List[Dict[str, Any]]:
         """Parse log content into segments with metadata"""
-        lines = content.splitlines()
-        segments = []
-        
-        for line in lines:
+        return list(self.iter_parse_log(content))
+    
+    def iter_parse_log(self, content: str) -> Iterator[Dict[str, Any]]:
+        """Parse log content into segments with metadata, one line at a time"""
+        for line in _iter_lines(content):
             if not line.strip():
                 continue
             
             parsed = self.parse_line(line)
             if parsed:
-                segments.append(parsed)
+                yield parsed
             else:
                 # If line doesn't match any pattern, add it as raw text
-                segments.append({
+                yield {
                     "text": line,
                     "message": line
-                })
-        
-        return segments
+                }
     
     def parse_line(self, line: str) -> Dict[str, Any]:
         """Parse a single log line"""
-        # Try each pattern
-        patterns = [
-            self.standard_pattern,
-            self.cisco_pattern,
-            self.nokia_pattern,
-            self.huawei_pattern,
-            self.ericsson_pattern
-        ]
-        
-        for pattern in patterns:
-            match = pattern.match(line)
-            if match:
-                timestamp, level, component, message = match.groups()
-                
-                return {
-                    "text": line,
-                    "timestamp": timestamp,
-                    "level": level,
-                    "component": component,
-                    "message": message
-                }
+        # Every format has an HH:MM:SS time, so lines without a colon can't
+        # match and skip the regex entirely
+        if ":" not in line:
+            return None
+            
+        # Try every pattern with a single match call
+        match = self.combined_pattern.match(line)
+        if match:
+            # The four fields of the format that matched follow its named group
+            start = match.lastindex
+            timestamp, level, component, message = match.groups()[start:start + 4]
+            
+            return {
+                "text": line,
+                "timestamp": timestamp,
+                "level": level,
+                "component": component,
+                "message": message
+            }
         
         return None
     
     def segment_log_for_embedding(self, content: str, max_chunk_size: int = 512) -> List[str]:
         """Segment log content into reasonable chunks for embedding"""
-        lines = content.splitlines()
-        
+        return list(self.iter_log_segments(content, max_chunk_size))
+    
+    def iter_log_segments(self, content: str, max_chunk_size: int = 512) -> Iterator[str]:
+        """Segment log content into chunks for embedding, yielding each as it is complete"""
         # Group lines into segments
-        segments = []
         current_segment = []
         current_length = 0
         
-        for line in lines:
-            line_length = len(line)
+        for lines in _iter_line_blocks(content):
+            # offsets[k] is the total length of the first k lines of the block
+            offsets = np.zeros(len(lines) + 1, dtype=np.int64)
+            np.cumsum(np.fromiter(map(len, lines), dtype=np.int64, count=len(lines)), out=offsets[1:])
             
-            # If adding this line would exceed max_chunk_size, start a new segment
-            if current_length + line_length > max_chunk_size and current_segment:
-                segments.append("\n".join(current_segment))
+            start = 0
+            if current_segment:
+                # Fill up the segment carried over from the previous block
+                limit = max_chunk_size - current_length
+                end = max(int(np.searchsorted(offsets, limit, side="right")) - 1, 0)
+                current_segment.extend(lines[:end])
+                current_length += int(offsets[end])
+                if end == len(lines):
+                    continue
+                yield "\n".join(current_segment)
                 current_segment = []
                 current_length = 0
+                start = end
+                
+            # For a segment starting at each line, the line that would take it
+            # past max_chunk_size; every segment gets at least one line
+            ends = np.searchsorted(offsets, offsets[:-1] + max_chunk_size, side="right") - 1
+            ends = np.maximum(ends, np.arange(1, len(lines) + 1)).tolist()
             
-            # Add line to current segment
-            current_segment.append(line)
-            current_length += line_length
+            while start < len(lines):
+                end = ends[start]
+                if end == len(lines):
+                    # The last segment may continue into the next block
+                    current_segment = lines[start:]
+                    current_length = int(offsets[-1] - offsets[start])
+                    break
+                yield "\n".join(lines[start:end])
+                start = end
         
         # Add the last segment if it's not empty
         if current_segment:
-            segments.append("\n".join(current_segment))
-        
-        return segments
+            yield "\n".join(current_segment)
     
     def is_valid_telecom_log(self, content: str) -> bool:
         """Check if the content looks like a valid telecom log"""
         # Take a sample of the first 20 non-empty lines
-        lines = [line for line in content.splitlines() if line.strip()][:20]
+        lines = list(islice((line for line in _iter_lines(content) if line.strip()), 20))
         
         # Count how many lines match our telecom log pattern
         matches = 0
@@ -144,23 +210,20 @@ class LogParser:
     
     def extract_timestamps(self, content: str) -> List[Dict[str, str]]:
         """Extract timestamps from log content with their associated lines"""
-        lines = content.splitlines()
-        timestamps = []
-        
-        for line in lines:
-            for pattern in [
-                self.standard_pattern,
-                self.cisco_pattern,
-                self.nokia_pattern,
-                self.huawei_pattern,
-                self.ericsson_pattern
-            ]:
-                match = pattern.match(line)
-                if match and match.group(1):  # If we have a timestamp
-                    timestamps.append({
-                        "timestamp": match.group(1),
+        return list(self.iter_timestamps(content))
+    
+    def iter_timestamps(self, content: str) -> Iterator[Dict[str, str]]:
+        """Extract timestamps from log content with their associated lines, one at a time"""
+        for line in _iter_lines(content):
+            # Lines without an HH:MM:SS time can't carry a timestamp
+            if ":" not in line:
+                continue
+            match = self.combined_pattern.match(line)
+            if match:
+                # The timestamp is the first field after the format's group
+                timestamp = match.group(match.lastindex + 1)
+                if timestamp:  # If we have a timestamp
+                    yield {
+                        "timestamp": timestamp,
                         "line": line
-                    })
-                    break
-        
-        return timestamps
\ No newline at end of file
+                    }
\ No newline at end of file
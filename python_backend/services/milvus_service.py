@@ -4,7 +4,10 @@ Module for interacting with Milvus vector database
 import os
 import time
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import List, Dict, Any, Optional, Union
+import numpy as np
 from dotenv import load_dotenv
 
 # Conditionally import pymilvus
@@ -24,6 +27,22 @@ except ImportError:
 # Load environment variables
 load_dotenv()
 
+# Vectors are stored unit-length, so inner product equals cosine similarity
+# and the HNSW graph avoids the exhaustive scan of a FLAT index
+INDEX_PARAMS = {
+    "metric_type": "IP",
+    "index_type": "HNSW",
+    "params": {"M": 16, "efConstruction": 200}
+}
+
+class ReindexRequired(Exception):
+    """Raised when the stored collection must be re-indexed before searching"""
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale each row of a float32 matrix to unit length, leaving zero rows as is"""
+    norms = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))[:, np.newaxis]
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
 class MilvusService:
     """Service for vector database operations with Milvus"""
     
@@ -37,6 +56,25 @@ class MilvusService:
         self.collection_name = "telecom_log_vectors"
         self.dimension = 384  # For all-MiniLM-L6-v2 embeddings
         
+        # Collection handle, created once since each Collection() call
+        # fetches the schema from the server
+        self._collection = None
+        
+        # Whether the collection has been loaded into memory for searching
+        self._loaded = False
+        
+        # Whether the vector index was checked to use INDEX_PARAMS' metric
+        self._index_checked = False
+        
+        # Maximum number of rows sent in one insert request
+        self.insert_batch_size = int(os.getenv("MILVUS_INSERT_BATCH_SIZE", "1024"))
+        
+        # Insert requests for one log that may be in flight at once, sent
+        # from a worker pool created on first use
+        self.insert_concurrency = int(os.getenv("MILVUS_INSERT_CONCURRENCY", "4"))
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        
         # Check if Milvus is available (for development/testing)
         self.mock_mode = not HAS_MILVUS or os.getenv("USE_MOCK_MILVUS", "false").lower() == "true"
         
@@ -66,6 +104,101 @@ class MilvusService:
             self.mock_mode = True
             return False
             
+    def _get_collection(self) -> "Collection":
+        """Get the cached handle for the log vector collection"""
+        if self._collection is None:
+            self._collection = Collection(self.collection_name)
+        return self._collection
+        
+    def _index_metric(self, collection: "Collection") -> Optional[str]:
+        """Get the metric type of the collection's vector index, if it has one"""
+        for index in collection.indexes:
+            if index.field_name == "vector":
+                return index.params.get("metric_type")
+        return None
+        
+    def _check_index_metric(self) -> None:
+        """Raise ReindexRequired if the collection predates the unit-vector IP index"""
+        if self._index_checked:
+            return
+            
+        metric_type = self._index_metric(self._get_collection())
+        if metric_type != INDEX_PARAMS["metric_type"]:
+            raise ReindexRequired(
+                f"Collection {self.collection_name} has a {metric_type or 'missing'} vector index, "
+                f"but searches use {INDEX_PARAMS['metric_type']} on unit-length vectors. "
+                f"Run MilvusService().reindex_collection() to re-normalize the stored "
+                f"vectors and rebuild the index"
+            )
+        self._index_checked = True
+        
+    def reindex_collection(self, batch_size: int = 1024) -> int:
+        """Re-normalize stored vectors and rebuild the vector index with INDEX_PARAMS"""
+        if self.mock_mode:
+            return 0
+            
+        collection = self._get_collection()
+        metric_type = self._index_metric(collection)
+        
+        # Rows can only be queried from a loaded collection, and a collection
+        # without an index can't be loaded
+        if metric_type is None:
+            collection.create_index(field_name="vector", index_params=INDEX_PARAMS)
+        collection.load()
+        
+        # Collect the ids first, since the rewritten rows get new auto ids
+        ids = []
+        iterator = collection.query_iterator(batch_size=batch_size, output_fields=["id"])
+        while True:
+            rows = iterator.next()
+            if not rows:
+                break
+            ids.extend(row["id"] for row in rows)
+        iterator.close()
+        
+        # Rows stored before vectors were unit-normalized would rank by
+        # vector length under IP, so each one is rewritten normalized
+        for start in range(0, len(ids), batch_size):
+            batch_ids = ids[start:start + batch_size]
+            rows = collection.query(
+                expr=f"id in {batch_ids}",
+                output_fields=["log_id", "segment_id", "vector", "text"]
+            )
+            if not rows:
+                continue
+            vectors = np.asarray([row["vector"] for row in rows], dtype=np.float32)
+            collection.insert([
+                [row["log_id"] for row in rows],
+                [row["segment_id"] for row in rows],
+                _normalize_rows(vectors),
+                [row["text"] for row in rows]
+            ])
+            collection.delete(f"id in {[row['id'] for row in rows]}")
+        collection.flush()
+        
+        # The index has to be released before it can be dropped
+        collection.release()
+        self._loaded = False
+        if self._index_metric(collection) != INDEX_PARAMS["metric_type"]:
+            collection.drop_index()
+            collection.create_index(field_name="vector", index_params=INDEX_PARAMS)
+        self._index_checked = False
+        
+        print(f"Re-indexed {len(ids)} vectors in {self.collection_name} as "
+              f"{INDEX_PARAMS['index_type']}/{INDEX_PARAMS['metric_type']}")
+        return len(ids)
+        
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the worker pool used for concurrent insert batches"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.insert_concurrency,
+                        thread_name_prefix="milvus-insert"
+                    )
+        return self._executor
+        
     def _create_collection_if_not_exists(self) -> bool:
         """Create collection if it doesn't exist"""
         if self.mock_mode:
@@ -90,14 +223,12 @@ class MilvusService:
             
             # Create collection
             collection = Collection(name=self.collection_name, schema=schema)
+            self._collection = collection
+            self._loaded = False
+            self._index_checked = False
             
             # Create index for vector field
-            index_params = {
-                "metric_type": "L2",
-                "index_type": "FLAT",
-                "params": {}
-            }
-            collection.create_index(field_name="vector", index_params=index_params)
+            collection.create_index(field_name="vector", index_params=INDEX_PARAMS)
             
             print(f"Created collection {self.collection_name} with index")
             return True
@@ -106,7 +237,8 @@ class MilvusService:
             self.mock_mode = True
             return False
             
-    def insert_embeddings(self, log_id: int, text_segments: List[str], vectors: List[List[float]]) -> List[int]:
+    def insert_embeddings(self, log_id: int, text_segments: List[str],
+                          vectors: Union[np.ndarray, List[List[float]]]) -> List[int]:
         """Insert embeddings into Milvus"""
         if self.mock_mode:
             # Return mock IDs
@@ -117,26 +249,64 @@ class MilvusService:
             if not self._create_collection_if_not_exists():
                 raise Exception("Collection doesn't exist and couldn't be created")
                 
-            # Prepare data
-            entities = [
-                {"log_id": log_id, "segment_id": i, "vector": vector, "text": text}
-                for i, (text, vector) in enumerate(zip(text_segments, vectors))
-            ]
+            # One contiguous float32 matrix of unit-length rows
+            count = min(len(text_segments), len(vectors))
+            vectors = np.asarray(vectors[:count], dtype=np.float32).reshape(count, self.dimension)
+            vectors = _normalize_rows(vectors)
             
             # Get collection
-            collection = Collection(self.collection_name)
-            
-            # Insert data
-            insert_result = collection.insert(entities)
+            collection = self._get_collection()
             
-            print(f"Inserted {len(entities)} vectors for log ID {log_id}")
-            return insert_result.primary_keys
+            # Insert column-oriented data in schema field order, in batches so
+            # large logs stay within the server's request size limit
+            def insert_batch(start: int) -> List[int]:
+                end = min(start + self.insert_batch_size, count)
+                insert_result = collection.insert([
+                    [log_id] * (end - start),
+                    list(range(start, end)),
+                    vectors[start:end],
+                    text_segments[start:end]
+                ])
+                return insert_result.primary_keys
+                
+            # Several batches are sent concurrently; keys are collected in
+            # batch order
+            starts = range(0, count, self.insert_batch_size)
+            futures = []
+            primary_keys = []
+            try:
+                if len(starts) > 1:
+                    executor = self._get_executor()
+                    futures = [executor.submit(insert_batch, start) for start in starts]
+                    for future in futures:
+                        primary_keys.extend(future.result())
+                else:
+                    for start in starts:
+                        primary_keys.extend(insert_batch(start))
+            except Exception as e:
+                if futures:
+                    # Stop batches that haven't started and wait for the ones
+                    # in flight, so the keys returned match what was stored
+                    for future in futures:
+                        future.cancel()
+                    wait(futures)
+                    primary_keys = [
+                        key
+                        for future in futures
+                        if not future.cancelled() and future.exception() is None
+                        for key in future.result()
+                    ]
+                print(f"Failed to insert embeddings: {e}; inserted {len(primary_keys)} of {count} vectors for log ID {log_id}")
+                return primary_keys
+                
+            print(f"Inserted {count} vectors for log ID {log_id}")
+            return primary_keys
         except Exception as e:
-            print(f"Failed to insert embeddings: {e}")
-            # Return mock IDs in case of failure
-            return [i + 1 for i in range(len(text_segments))]
+            # Nothing was stored, so there are no keys to return
+            print(f"Failed to insert embeddings: {e}; inserted 0 vectors for log ID {log_id}")
+            return []
             
-    def search_similar_segments(self, query_vector: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
+    def search_similar_segments(self, query_vector: Union[np.ndarray, List[float]], top_k: int = 5) -> List[Dict[str, Any]]:
         """Search for similar segments using vector similarity"""
         if self.mock_mode:
             # Return mock results
@@ -156,19 +326,27 @@ class MilvusService:
             if not utility.has_collection(self.collection_name):
                 raise Exception(f"Collection {self.collection_name} does not exist")
                 
-            # Get collection
-            collection = Collection(self.collection_name)
-            collection.load()
+            # An index built for another metric rejects IP searches
+            self._check_index_metric()
+            
+            # Get collection, loading it into memory once and keeping it
+            # loaded for later searches
+            collection = self._get_collection()
+            if not self._loaded:
+                collection.load()
+                self._loaded = True
             
-            # Search parameters
+            # Search parameters; a wider HNSW search list than the result
+            # count keeps recall high
             search_params = {
-                "metric_type": "L2",
-                "params": {"nprobe": 10}
+                "metric_type": INDEX_PARAMS["metric_type"],
+                "params": {"ef": max(top_k * 4, 64)}
             }
             
             # Perform search
+            query = _normalize_rows(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))
             results = collection.search(
-                data=[query_vector],
+                data=[query[0]],
                 anns_field="vector",
                 param=search_params,
                 limit=top_k,
@@ -184,15 +362,18 @@ class MilvusService:
                         "log_id": hit.entity.get("log_id"),
                         "segment_id": hit.entity.get("segment_id"),
                         "text": hit.entity.get("text"),
-                        "score": 1.0 - hit.distance  # Convert distance to similarity score
+                        "score": hit.distance  # Inner product of unit vectors is the cosine similarity
                     })
                     
-            # Release collection
-            collection.release()
-            
             return formatted_results
+        except ReindexRequired:
+            # Mock results would hide that the collection needs migrating
+            raise
         except Exception as e:
             print(f"Failed to search similar segments: {e}")
+            # The collection may have been released or dropped; load it
+            # again on the next search
+            self._loaded = False
             # Return mock results in case of failure
             return [
                 {
@@ -205,6 +386,19 @@ class MilvusService:
                 for i in range(top_k)
             ]
             
+    def close(self) -> None:
+        """Release the loaded collection and disconnect from Milvus"""
+        if self.mock_mode:
+            return
+            
+        try:
+            if self._loaded:
+                self._get_collection().release()
+                self._loaded = False
+            connections.disconnect("default")
+        except Exception as e:
+            print(f"Failed to close Milvus connection: {e}")
+            
     def get_collection_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector collection"""
         if self.mock_mode:
@@ -212,7 +406,7 @@ class MilvusService:
             return {
                 "entity_count": 1250,
                 "data_size": "2.5 MB",
-                "index_type": "FLAT",
+                "index_type": INDEX_PARAMS["index_type"],
                 "dimension": self.dimension,
                 "last_updated": "2023-01-01T12:00:00Z"
             }
@@ -223,7 +417,7 @@ class MilvusService:
                 raise Exception(f"Collection {self.collection_name} does not exist")
                 
             # Get collection
-            collection = Collection(self.collection_name)
+            collection = self._get_collection()
             
             # Get stats
             stats = {
@@ -249,7 +443,7 @@ class MilvusService:
             return {
                 "entity_count": 1250,
                 "data_size": "2.5 MB",
-                "index_type": "FLAT",
+                "index_type": INDEX_PARAMS["index_type"],
                 "dimension": self.dimension,
                 "last_updated": "2023-01-01T12:00:00Z"
             }
@@ -275,7 +469,7 @@ class MilvusService:
                 raise Exception(f"Collection {self.collection_name} does not exist")
                 
             # Get collection
-            collection = Collection(self.collection_name)
+            collection = self._get_collection()
             
             # Query recent entries
             # Note: Milvus doesn't have a timestamp field by default,
@@ -49,6 +49,7 @@ python3 -m llama_cpp.server \
     --port $PORT \
     --n_ctx $CONTEXT_SIZE \
     --n_threads $(nproc) \
-    --embedding
+    --embedding \
+    --cache true
 
 echo "LLM server stopped."
\ No newline at end of file